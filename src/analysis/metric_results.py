@@ -1,5 +1,10 @@
 import numpy as np
 
+try:
+    from bottleneck import nanmedian
+except ImportError:
+    from numpy import nanmedian
+
 
 class MetricResults():
 
@@ -76,7 +81,7 @@ class MetricResults():
         return np.nanmean(self.get_values(name_metric, axes_value), axis=axis_mean)
 
     def median(self, name_metric: str, axes_value: tuple, axis_mean: tuple):
-        return np.nanmedian(self.get_values(name_metric, axes_value), axis=axis_mean)
+        return nanmedian(self.get_values(name_metric, axes_value), axis=axis_mean)
 
     def std(self, name_metric: str, axes_value: tuple, axis_mean: tuple):
         return np.nanstd(self.get_values(name_metric, axes_value), axis=axis_mean)
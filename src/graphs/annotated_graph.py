@@ -1,3 +1,6 @@
+import heapq
+from array import array
+
 import networkx as nx
 import numpy as np
 
@@ -29,6 +32,14 @@ class AnnotatedGraph(BaseGraph):
         self.G.graph['edge_soft_weight'] = {}  # only important for wug
         self.G.graph['edge_added_weights'] = {}  # only important for wug
 
+        # running median per edge: (u, v) -> [low_max_heap, high_min_heap, median]
+        # maintained incrementally, so no np.nanmedian over the full judgement list is needed
+        self._edge_heaps = {}
+
+        # nodes of the sampled graph not yet added here; seeded lazily by the
+        # dwug sampling and kept current whenever edges land in the graph
+        self._not_added_nodes = None
+
         self.G.graph['distribution'] = 'simulated'  # only important for wug
 
     def get_edge(self, u_node: int, v_node: int, **params) -> float or None:
@@ -40,13 +51,13 @@ class AnnotatedGraph(BaseGraph):
             :param v_node: second node
             :return float: weight
         """
-        u, v = sorted([u_node, v_node])
-        weight = self.G.graph['edge_added_weights'].get((u, v), None)
+        u, v = (u_node, v_node) if u_node < v_node else (v_node, u_node)
+        entry = self._get_edge_heaps().get((u, v), None)
 
-        if weight is None:
+        if entry is None:
             return None
 
-        weight = np.nanmedian(weight)
+        weight = entry[2]
         return 0 if np.isnan(weight) else weight
 
     def add_edge(self, node_u: int, node_v: int, weight: float, **params) -> None:
@@ -59,32 +70,96 @@ class AnnotatedGraph(BaseGraph):
             :param v_node: second node
             :param weight: weight
         """
-        u, v = sorted([node_u, node_v])
+        u, v = (node_u, node_v) if node_u < node_v else (node_v, node_u)
         nweight = weight if weight != 0 else np.nan
 
-        if self.G.graph['edge_added_weights'].get((u, v), None) is None:
-            self.G.graph['edge_added_weights'][(u, v)] = []
-        self.G.graph['edge_added_weights'][(u, v)].append(nweight)
+        graph = self.G.graph
+
+        # rebuild the heaps before recording this judgement, otherwise the
+        # replay of a pre-heap pickle would consume it a second time
+        self._get_edge_heaps()
+
+        # raw judgements are kept for serialization only (as compact float arrays,
+        # not lists of float objects), the median is maintained incrementally
+        graph['edge_added_weights'].setdefault((u, v), array('f')).append(nweight)
 
-        weight_to_add = np.nanmedian(self.G.graph['edge_added_weights'].get((u, v), [nweight]))
+        weight_to_add = self._update_median(u, v, nweight)
 
         if np.isnan(weight_to_add):
             self.last_edge = [int(node_u), int(node_v)]
             self.judgements += 1
             return
 
-        self.G.add_weighted_edges_from([(u, v, weight_to_add)])
-
-        self.G.graph['edge_weight'][(u, v)] = weight_to_add
-        self.G.graph['edge_soft_weight'][(u, v)] = weight_to_add - 2.5
+        adj = self.G._adj
+        if u in adj and v in adj[u]:
+            # existing edge: both directions share one attribute dict
+            adj[u][v]['weight'] = weight_to_add
+        else:
+            self.G.add_edge(u, v, weight=weight_to_add)
+            not_added = getattr(self, '_not_added_nodes', None)
+            if not_added is not None:
+                not_added.discard(u)
+                not_added.discard(v)
 
-        if self.G.graph['weight_edge'].get(weight_to_add, None) is None:
-            self.G.graph['weight_edge'][weight_to_add] = []
-        self.G.graph['weight_edge'][weight_to_add].append((u, v))
+        graph['edge_weight'][(u, v)] = weight_to_add
+        graph['edge_soft_weight'][(u, v)] = weight_to_add - 2.5
+        graph['weight_edge'].setdefault(weight_to_add, []).append((u, v))
 
         self.last_edge = [int(node_u), int(node_v)]
         self.judgements += 1
 
+    def _get_edge_heaps(self) -> dict:
+        """
+        Returns the running-median heaps of this graph.
+        getattr plus a replay of the tracked judgements,
+        so graphs pickled before the heaps existed still work.
+
+        Args:
+            :return dict: (u, v) -> [low_max_heap, high_min_heap, median]
+        """
+        heaps = getattr(self, '_edge_heaps', None)
+        if heaps is None:
+            heaps = self._edge_heaps = {}
+            for (u, v), judgements in self.G.graph['edge_added_weights'].items():
+                for nweight in judgements:
+                    self._update_median(u, v, float(nweight))
+        return heaps
+
+    def _update_median(self, u: int, v: int, nweight: float) -> float:
+        """
+        Updates the running median of the edge (u, v) with a new judgement.
+        NaN judgements are ignored; the median over two heaps is updated in O(log N).
+
+        Args:
+            :param u: first node (sorted)
+            :param v: second node (sorted)
+            :param nweight: new judgement, possibly NaN
+            :return float: current median of the edge (NaN, if only NaN judgements arrived)
+        """
+        heaps = self._get_edge_heaps()
+        entry = heaps.get((u, v), None)
+        if entry is None:
+            entry = [[], [], np.nan]
+            heaps[(u, v)] = entry
+
+        if np.isnan(nweight):
+            return entry[2]
+
+        low, high = entry[0], entry[1]
+
+        if not low or nweight <= -low[0]:
+            heapq.heappush(low, -nweight)
+        else:
+            heapq.heappush(high, nweight)
+
+        if len(low) > len(high) + 1:
+            heapq.heappush(high, -heapq.heappop(low))
+        elif len(high) > len(low):
+            heapq.heappush(low, -heapq.heappop(high))
+
+        entry[2] = -low[0] if len(low) > len(high) else (-low[0] + high[0]) / 2
+        return entry[2]
+
     def add_edges(self, edge_list: list, **params) -> None:
         """
         Adds an list of edges to the graph.
@@ -95,8 +170,52 @@ class AnnotatedGraph(BaseGraph):
         Args:
             :param edge_list: edges to add
         """
-        for edge in edge_list:
-            self.add_edge(*edge)
+        if len(edge_list) == 0:
+            return
+
+        arr = np.asarray(edge_list, dtype=float)
+        uv = np.sort(arr[:, :2], axis=1).astype(int)
+        nweights = np.where(arr[:, 2] == 0, np.nan, arr[:, 2])
+
+        edge_added_weights = self.G.graph['edge_added_weights']
+
+        # rebuild the heaps before recording the judgements, otherwise the
+        # replay of a pre-heap pickle would consume them a second time
+        self._get_edge_heaps()
+
+        # group judgements by canonical (u, v), so each edge is touched once
+        unique_uv, inverse = np.unique(uv, axis=0, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        boundaries = np.flatnonzero(np.diff(inverse[order])) + 1
+
+        batch = []
+        for edge, group in zip(unique_uv, np.split(order, boundaries)):
+            u, v = int(edge[0]), int(edge[1])
+
+            edge_added_weights.setdefault((u, v), array('f')).extend(nweights[group])
+
+            for nweight in nweights[group]:
+                weight_to_add = self._update_median(u, v, nweight)
+
+            if np.isnan(weight_to_add):
+                continue
+
+            batch.append((u, v, weight_to_add))
+
+            self.G.graph['edge_weight'][(u, v)] = weight_to_add
+            self.G.graph['edge_soft_weight'][(u, v)] = weight_to_add - 2.5
+            self.G.graph['weight_edge'].setdefault(weight_to_add, []).append((u, v))
+
+        if len(batch) > 0:
+            self.G.add_weighted_edges_from(batch)
+            not_added = getattr(self, '_not_added_nodes', None)
+            if not_added is not None:
+                for u, v, _ in batch:
+                    not_added.discard(u)
+                    not_added.discard(v)
+
+        self.last_edge = [int(edge_list[-1][0]), int(edge_list[-1][1])]
+        self.judgements += len(edge_list)
 
     def get_last_added_edge(self):
         return self.last_edge
@@ -110,14 +229,21 @@ class AnnotatedGraph(BaseGraph):
         return self.judgements
 
     def get_weight_edge(self) -> dict:
-        edge_weights = self.G.graph['edge_added_weights']
+        edge_heaps = self._get_edge_heaps()
+        if len(edge_heaps) == 0:
+            return dict()
+
+        keys = list(edge_heaps.keys())
+        medians = np.fromiter((v[2] for v in edge_heaps.values()), dtype=np.float64, count=len(keys))
+
+        # group edges by median in one pass instead of probing the dict per edge
+        uniq, inverse = np.unique(medians, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        boundaries = np.flatnonzero(np.diff(inverse[order])) + 1
 
         weights_edges = dict()
-        for k, v in edge_weights.items():
-            ac_weight = np.nanmedian(v)
-            if weights_edges.get(ac_weight, None) is None:
-                weights_edges[ac_weight] = []
-            weights_edges[ac_weight].append(k)
+        for weight, idx in zip(uniq, np.split(order, boundaries)):
+            weights_edges[float(weight)] = [keys[i] for i in idx]
 
         return weights_edges
 
@@ -134,10 +260,20 @@ class AnnotatedGraph(BaseGraph):
         graph = nx.Graph()
 
         if weights is not None:
-            graph.add_weighted_edges_from(list(map(lambda k: (*k[0], k[1]), weights.items())))
+            graph.add_weighted_edges_from([(u, v, w) for (u, v), w in weights.items()])
         else:
             assert callable(fmap)
-            graph.add_weighted_edges_from(list(map(lambda k: (*k[0], fmap(k[1])), self.G.graph['edge_weight'].items())))
+            edge_weight = self.G.graph['edge_weight']
+            w = np.fromiter(edge_weight.values(), dtype=np.float64, count=len(edge_weight))
+            try:
+                # apply fmap on the whole weight array at once, if it supports it
+                mapped = np.asarray(fmap(w), dtype=np.float64)
+                if mapped.shape != w.shape:
+                    raise TypeError
+            except (TypeError, ValueError):
+                # scalar-only maps (e.g. ones branching on the value) land here
+                mapped = np.array([fmap(x) for x in w])
+            graph.add_weighted_edges_from([(u, v, mw) for (u, v), mw in zip(edge_weight.keys(), mapped)])
 
         return graph
 
@@ -1,5 +1,6 @@
 import pickle
 import networkx as nx
+import numpy as np
 
 
 class BaseGraph():
@@ -31,6 +32,9 @@ class BaseGraph():
         # metric dict
         self.G.graph['metrics'] = {}
 
+        # derived from community_nodes, rebuilt on membership updates
+        self._community_sizes = None
+
     # Edge functionality
 
     def get_edge(self, u_node: int, v_node: int, **params) -> float or None:
@@ -84,7 +88,11 @@ class BaseGraph():
         return len(self.G.graph['community_nodes'])
 
     def get_community_sizes(self) -> list:
-        return [len(v) for k, v in self.G.graph['community_nodes'].items()]
+        # getattr, so graphs pickled before this cache existed still work
+        sizes = getattr(self, '_community_sizes', None)
+        if sizes is None:
+            sizes = self._community_sizes = [len(v) for k, v in self.G.graph['community_nodes'].items()]
+        return sizes
 
     def get_dictionary_of_graph(self, name: str) -> list:
         return self.G.graph[name]
@@ -108,9 +116,31 @@ class BaseGraph():
         return self.labels
 
     # util functions
+    def reset(self) -> None:
+        """
+        Clears all nodes, edges and tracked graph dicts,
+            so the same graph object can be reused without reallocating it.
+        """
+        self.G.clear()
+        self.labels = []
+
+        self.G.graph['community_nodes'] = {}
+        self.G.graph['node_community'] = {}
+
+        self.G.graph['edge_weight'] = {}
+        self.G.graph['weight_edge'] = {}
+        self.G.graph['edge_soft_weight'] = {}
+
+        self.G.graph['edge_weight_history'] = {}
+
+        self.G.graph['metrics'] = {}
+
+        self._community_sizes = None
+
     def update_community_nodes_membership(self, new_community_nodes: dict) -> None:
         assert type(new_community_nodes) == dict
         self.G.graph['community_nodes'] = new_community_nodes
+        self._community_sizes = None
 
         for k, v in new_community_nodes.items():
             for nodes in v:
@@ -123,10 +153,20 @@ class BaseGraph():
         graph = nx.Graph()
 
         if weights is not None:
-            graph.add_weighted_edges_from(list(map(lambda k: (*k[0], k[1]), weights.items())))
+            graph.add_weighted_edges_from([(u, v, w) for (u, v), w in weights.items()])
         else:
             assert callable(fmap)
-            graph.add_weighted_edges_from(list(map(lambda k: (*k[0], fmap(k[1])), self.G.graph['edge_weight'].items())))
+            edge_weight = self.G.graph['edge_weight']
+            w = np.fromiter(edge_weight.values(), dtype=np.float64, count=len(edge_weight))
+            try:
+                # apply fmap on the whole weight array at once, if it supports it
+                mapped = np.asarray(fmap(w), dtype=np.float64)
+                if mapped.shape != w.shape:
+                    raise TypeError
+            except (TypeError, ValueError):
+                # scalar-only maps (e.g. ones branching on the value) land here
+                mapped = np.array([fmap(x) for x in w])
+            graph.add_weighted_edges_from([(u, v, mw) for (u, v), mw in zip(edge_weight.keys(), mapped)])
 
         return graph
 
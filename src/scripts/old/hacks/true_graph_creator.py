@@ -1,5 +1,6 @@
 import os
 import pickle
+import multiprocessing
 
 from graphs.simulation_graph_sampler import SimulationGraphSampler
 from datetime import datetime
@@ -12,16 +13,21 @@ distribution = ['binomial', 3, 0.99]
 path_out = 'data/graphs/kw32/simulation_graphs'
 name = 'n{}_k{}_log{}.graph'
 
-try:
-    os.makedirs(path_out)
-except FileExistsError:
-    pass
 
-for k in ks:
-    for log in logs:
-        size_communities = ('log_iter', {'std_dev': log, 'threshold': 5})
+def _make_one(k: int, log: float) -> None:
+    size_communities = ('log_iter', {'std_dev': log, 'threshold': 5})
 
-        true = SimulationGraphSampler(n, k, size_communities, distribution).sample_simulation_graph()
-        with open('{}/{}'.format(path_out, name.format(n, k, log)), 'wb') as file:
-            pickle.dump(true, file)
-        file.close()
+    true = SimulationGraphSampler(n, k, size_communities, distribution).sample_simulation_graph()
+    with open('{}/{}'.format(path_out, name.format(n, k, log)), 'wb', buffering=1 << 20) as file:
+        pickle.dump(true, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+if __name__ == '__main__':
+    try:
+        os.makedirs(path_out)
+    except FileExistsError:
+        pass
+
+    # every (k, log) graph is generated independently
+    with multiprocessing.Pool() as pool:
+        pool.starmap(_make_one, [(k, log) for k in ks for log in logs])
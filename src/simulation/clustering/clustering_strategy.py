@@ -10,6 +10,7 @@ from chinese_whispers import chinese_whispers as _chinese_whispers
 from chinese_whispers import aggregate_clusters as _aggregate_clusters
 from community.community_louvain import best_partition as _louvain_partition
 from networkx import connected_components
+from networkx import restricted_view
 from simulation.clustering.utils.utils import sort_len_nodes as _clsort
 from simulation.clustering.utils.utils import louvain_cluster_sort as _lvsort
 from simulation.clustering.utils.utils import generate_graphtool_graph as _ggg
@@ -75,6 +76,7 @@ def new_correlation_clustering(graph: BaseGraph, params: dict) -> dict:
         :param split_flag: optional flag, if non evidence cluster should be splitted
         :param ru_old_cluster: optional flag, if old cluster should be reused
         :param cores: optional, cores to be used for clustering search, default 4
+        :param G: optional pre-built nx.Graph, skips the copy from :graph:
         :return labels: dict with label-node key-value pairs
     """
     # ===Guard Phase===
@@ -98,12 +100,17 @@ def new_correlation_clustering(graph: BaseGraph, params: dict) -> dict:
 
     cores = params.get('cores', 4)
     assert type(cores) == int
+
+    G = params.get('G', None)
     # ===Guard Phase===
 
     initial = [set(v) for k, v in sorted(graph.get_community_nodes().items())] if ru_old_cluster else []
 
-    clusters, stats = _new_cluster_correlation_search(G=graph.get_nx_graph_copy(
-        weights), s=s, max_attempts=max_attempts, max_iters=max_iters, initial=initial, split_flag=split_flag, max_processor_count=cores)
+    if G is None:
+        G = graph.get_nx_graph_copy(weights)
+
+    clusters, stats = _new_cluster_correlation_search(
+        G=G, s=s, max_attempts=max_attempts, max_iters=max_iters, initial=initial, split_flag=split_flag, max_processor_count=cores)
 
     community_node = {}
     for cluster_id, cluster in enumerate(clusters):
@@ -119,20 +126,23 @@ def connected_components_clustering(graph: BaseGraph, params: dict) -> dict:
     Args"
         :param graph: graph to clusters
         :param weights: weights to be used for clustering
+        :param G: optional pre-built nx.Graph, skips the copy from :graph:
         :return labels: dict with label-node key-value pairs
     """
     weights = params.get('weights', 'edge_weight')
     assert type(weights) == str
 
-    G = graph.get_nx_graph_copy(weights)
+    G = params.get('G', None)
+    if G is None:
+        G = graph.get_nx_graph_copy(weights)
 
     def is_non_value(x):
         return np.isnan(x)
 
     edges_negative = [(i, j) for (i, j) in G.edges() if G[i]
                       [j]['weight'] < 0.0 or is_non_value(G[i][j]['weight'])]
-    G.remove_edges_from(edges_negative)
-    return _clsort({i: list(component) for i, component in enumerate(connected_components(G))})
+    # hide the negative edges through a view, so a shared pre-built G stays intact
+    return _clsort({i: list(component) for i, component in enumerate(connected_components(restricted_view(G, [], edges_negative)))})
 
 
 def chinese_whisper_clustering(graph: BaseGraph, params: dict) -> dict:
@@ -142,12 +152,15 @@ def chinese_whisper_clustering(graph: BaseGraph, params: dict) -> dict:
     Args:
         :param graph: graph to clusters
         :param weights: weights to be used for clustering
+        :param G: optional pre-built nx.Graph, skips the copy from :graph:
         :return labels: dict with label-node key-value pairs
     """
     weights = params.get('weights', 'edge_weight')
     assert type(weights) == str
 
-    G = graph.get_nx_graph_copy(weights)
+    G = params.get('G', None)
+    if G is None:
+        G = graph.get_nx_graph_copy(weights)
     _cw = _aggregate_clusters(_chinese_whispers(G, weighting='top', iterations=20))
     return _clsort({k: list(v) for k, v in _cw.items()})
 
@@ -6,6 +6,7 @@ import random
 import networkx as nx
 import numpy as np
 from scipy.stats import spearmanr
+from scipy.sparse.csgraph import connected_components as sp_connected_components
 from networkx.algorithms.dag import transitive_closure
 import six
 sys.modules['sklearn.externals.six'] = six
@@ -15,6 +16,11 @@ from sklearn import metrics
 from scipy.optimize import linear_sum_assignment
 import multiprocessing as mp
 
+try:
+    from bottleneck import nanmedian
+except ImportError:
+    from numpy import nanmedian
+
 
 def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initial=[], split_flag=True, max_processor_count=mp.cpu_count()):
     """
@@ -31,19 +37,20 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
 
     start_time = time.time()
     stats = {}
-    G = G.copy()
 
     if initial == []:  # initialize with connected components unless initial clustering is provided
         classes = cluster_connected_components(G)
     else:
         classes = initial
 
-    n2i = {node: i for i, node in enumerate(G.nodes())}
-    i2n = {i: node for i, node in enumerate(G.nodes())}
+    nodes = list(G.nodes())
+    n2i = dict(zip(nodes, range(len(nodes))))
     n2c = {n2i[node]: i for i, cluster in enumerate(classes) for node in cluster}
 
-    edges_positive = set([(n2i[i], n2i[j], G[i][j]['weight']) for (i, j) in G.edges() if G[i][j]['weight'] >= 0.0])
-    edges_negative = set([(n2i[i], n2i[j], G[i][j]['weight']) for (i, j) in G.edges() if G[i][j]['weight'] < 0.0])
+    # edges are unique in a simple graph, so plain arrays replace the tuple sets
+    edges = np.array([(n2i[u], n2i[v], d['weight']) for u, v, d in G.edges(data=True)], dtype=np.float64).reshape(-1, 3)
+    edges_positive = edges[edges[:, 2] >= 0.0]
+    edges_negative = edges[edges[:, 2] < 0.0]
 
     Linear_loss = Loss('linear_loss', edges_positive=edges_positive, edges_negative=edges_negative)
     # conflict_loss = test_loss
@@ -53,7 +60,7 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
     loss_init = Linear_loss.loss(init_state)
 
     if loss_init == 0.0:
-        classes.sort(key=lambda x: -len(x))  # sort by size
+        classes.sort(key=len, reverse=True)  # sort by size
         end_time = time.time()
         stats['runtime'] = (end_time - start_time) / 60
         return classes, stats
@@ -83,7 +90,7 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
 
     c2n = defaultdict(lambda: [])
     for i, c in enumerate(best_state):
-        c2n[c].append(i2n[i])
+        c2n[c].append(nodes[i])
 
     classes = [set(c2n[c]) for c in c2n]
 
@@ -91,7 +98,7 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
     if split_flag:
         classes = split_non_evidence_clusters(G, classes)
 
-    classes.sort(key=lambda x: -len(x))  # sort by size
+    classes.sort(key=len, reverse=True)  # sort by size
 
     end_time = time.time()
     stats['runtime'] = (end_time - start_time) / 60
@@ -104,10 +111,10 @@ class Loss(object):
     
     def __init__(self, fitness_fn, edges_positive=None, edges_negative=None, edges_min=None, edges_max=None, signs=None):
  
-        self.edges_positive = edges_positive
-        self.edges_negative = edges_negative
-        self.edges_min = edges_min
-        self.edges_max = edges_max
+        self.edges_positive = self._as_edge_columns(edges_positive)
+        self.edges_negative = self._as_edge_columns(edges_negative)
+        self.edges_min = self._as_edge_columns(edges_min)
+        self.edges_max = self._as_edge_columns(edges_max)
         self.signs = signs
         if fitness_fn == 'test_loss':
             self.fitness_fn = self.test_loss
@@ -118,6 +125,14 @@ class Loss(object):
         if fitness_fn == 'binary_loss_poles':
             self.fitness_fn = self.binary_loss_poles
 
+    @staticmethod
+    def _as_edge_columns(edges):
+        # normalizes an edge container to contiguous (i, j, w) columns
+        if edges is None:
+            return None
+        edges = np.asarray(list(edges) if isinstance(edges, set) else edges, dtype=np.float64).reshape(-1, 3)
+        return edges[:, 0].astype(np.intp), edges[:, 1].astype(np.intp), edges[:, 2]
+
     def loss(self, state):        
         return self.fitness_fn(state)
 
@@ -125,14 +140,20 @@ class Loss(object):
         return 50.0
 
     def linear_loss(self, state):        
-        loss_pos = np.sum([w for (i,j,w) in self.edges_positive if state[i] != state[j]])
-        loss_neg = np.sum([abs(w) for (i,j,w) in self.edges_negative if state[i] == state[j]])        
+        state = np.asarray(state)
+        pi, pj, pw = self.edges_positive
+        ni, nj, nw = self.edges_negative
+        loss_pos = pw[state[pi] != state[pj]].sum()
+        loss_neg = np.abs(nw)[state[ni] == state[nj]].sum()
         loss = loss_pos + loss_neg        
         return loss
 
     def binary_loss(self, state, signs=['pos', 'neg']):        
-        loss_pos = len([1 for (i,j,w) in self.edges_positive if state[i] != state[j]])
-        loss_neg = len([1 for (i,j,w) in self.edges_negative if state[i] == state[j]])
+        state = np.asarray(state)
+        pi, pj, _ = self.edges_positive
+        ni, nj, _ = self.edges_negative
+        loss_pos = int(np.count_nonzero(state[pi] != state[pj]))
+        loss_neg = int(np.count_nonzero(state[ni] == state[nj]))
         if self.signs==['pos', 'neg']:
             loss = loss_pos + loss_neg        
         elif self.signs==['pos']:
@@ -144,8 +165,11 @@ class Loss(object):
         return loss
 
     def binary_loss_poles(self, state, signs=['min', 'max']):
-        loss_min = len([1 for (i,j,w) in self.edges_min if state[i] == state[j]])
-        loss_max = len([1 for (i,j,w) in self.edges_max if state[i] != state[j]])
+        state = np.asarray(state)
+        mi, mj, _ = self.edges_min
+        xi, xj, _ = self.edges_max
+        loss_min = int(np.count_nonzero(state[mi] == state[mj]))
+        loss_max = int(np.count_nonzero(state[xi] != state[xj]))
         if self.signs==['min', 'max']:
             loss = loss_min + loss_max        
         elif self.signs==['min']:
@@ -199,13 +223,24 @@ def cluster_connected_components(G, is_non_value=lambda x: np.isnan(x)):
     :return classes: list of clusters
     """
 
-    G = G.copy()
+    nodes = list(G.nodes())
+    if len(nodes) == 0:
+        return []
 
-    edges_negative = [(i,j) for (i,j) in G.edges() if G[i][j]['weight'] < 0.0 or is_non_value(G[i][j]['weight'])]
-    G.remove_edges_from(edges_negative)
-    components = nx.connected_components(G)
-    classes = [set(component) for component in components]
-    classes.sort(key=lambda x:list(x)[0])
+    # label components on a CSR adjacency instead of copying the graph
+    # and traversing NetworkX adjacency dicts in Python
+    csr = nx.to_scipy_sparse_array(G, nodelist=nodes, weight='weight', format='csr')
+    csr.data = np.where((csr.data < 0.0) | is_non_value(csr.data), 0.0, 1.0)
+    csr.eliminate_zeros()
+
+    _, labels = sp_connected_components(csr, directed=False)
+
+    order = np.argsort(labels, kind='stable')
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+
+    node_arr = np.array(nodes)
+    classes = [set(node_arr[idx].tolist()) for idx in np.split(order, boundaries)]
+    classes.sort(key=lambda x: list(x)[0])
 
     return classes
 
@@ -289,7 +324,7 @@ def get_clusters(G):
         c2n[G.nodes()[node]['cluster']].append(node)
         
     classes = [set(c2n[c]) for c in c2n]
-    classes.sort(key=lambda x:-len(x)) # sort by size
+    classes.sort(key=len, reverse=True) # sort by size
         
     return classes
 
@@ -351,7 +386,7 @@ def get_low_prob_clusters(clusters, threshold=2):
     return clusters_low_prob
 
 
-def make_meta_graph(graph, test_statistic=np.nanmedian):
+def make_meta_graph(graph, test_statistic=nanmedian):
     """
     Make meta-graph from input graph.
     :param clusters: clusters
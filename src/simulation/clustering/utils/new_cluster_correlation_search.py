@@ -10,10 +10,8 @@ import random
 import networkx as nx
 import numpy as np
 from scipy.stats import spearmanr
+from scipy.sparse.csgraph import connected_components as sp_connected_components
 from networkx.algorithms.dag import transitive_closure
-import six
-sys.modules['sklearn.externals.six'] = six
-import mlrose
 import time
 from sklearn import metrics
 from scipy.optimize import linear_sum_assignment
@@ -33,7 +31,6 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
 
     start_time = time.time()
     stats = {}
-    G = G.copy()
 
     if initial == []:  # initialize with connected components unless initial clustering is provided
         classes = cluster_connected_components(G)
@@ -41,23 +38,28 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
         classes = initial
         # print(initial)
 
-    n2i = {node: i for i, node in enumerate(G.nodes())}
-    i2n = {i: node for i, node in enumerate(G.nodes())}
+    # the graph is only read from here on, so extract nodes and edges once
+    # instead of cloning all adjacency dicts
+    nodes = list(G.nodes())
+    n2i = dict(zip(nodes, range(len(nodes))))
     n2c = {n2i[node]: i for i, cluster in enumerate(
         classes) for node in cluster}
 
-    edges_positive = set([(n2i[i], n2i[j], G[i][j]['weight'])
-                         for (i, j) in G.edges() if G[i][j]['weight'] >= 0.0])
-    edges_negative = set([(n2i[i], n2i[j], G[i][j]['weight'])
-                         for (i, j) in G.edges() if G[i][j]['weight'] < 0.0])
+    edges = np.array([(n2i[u], n2i[v], d['weight'])
+                     for u, v, d in G.edges(data=True)], dtype=np.float64).reshape(-1, 3)
+    pos_mask = edges[:, 2] >= 0.0
+
+    # contiguous edge arrays, so the loss inside the annealing loop is a pure NumPy kernel
+    _pos = edges[pos_mask]
+    pos_i, pos_j, pos_w = _pos[:, 0].astype(np.intp), _pos[:, 1].astype(np.intp), _pos[:, 2]
+    _neg = edges[~pos_mask]
+    neg_i, neg_j, neg_w = _neg[:, 0].astype(np.intp), _neg[:, 1].astype(np.intp), np.abs(_neg[:, 2])
 
     def conflict_loss(state):
-        loss_pos = np.sum(
-            [w for (i, j, w) in edges_positive if state[i] != state[j]])
-        loss_neg = np.sum(
-            [abs(w) for (i, j, w) in edges_negative if state[i] == state[j]])
-        loss = loss_pos + loss_neg
-        return loss
+        state = np.asarray(state)
+        loss_pos = pos_w[state[pos_i] != state[pos_j]].sum()
+        loss_neg = neg_w[state[neg_i] == state[neg_j]].sum()
+        return loss_pos + loss_neg
 
     # Define initial state
     init_state = np.array([n2c[n] for n in sorted(n2c.keys())])
@@ -65,13 +67,14 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
 
     if loss_init == 0.0:
         # print('loss_init: ', loss_init)
-        classes.sort(key=lambda x: -len(x))  # sort by size
+        classes.sort(key=len, reverse=True)  # sort by size
         end_time = time.time()
         stats['runtime'] = (end_time - start_time) / 60
         return classes, stats
 
-    # Initialize custom fitness function object
-    conflict_loss_cust = mlrose.CustomFitness(conflict_loss)
+    # incident-edge CSR over positive and negative edges, so a label change
+    # of one node is evaluated in O(deg(node)) instead of a full loss pass
+    incidence = _build_incidence(len(nodes), pos_i, pos_j, pos_w, neg_i, neg_j, neg_w)
 
     l2s = defaultdict(lambda: [])
     l2s[loss_init].append((init_state, len(classes)))
@@ -80,26 +83,16 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
 
         # With initial state
         max_val = max(n, len(classes))
-        problem = mlrose.DiscreteOpt(length=len(
-            G.nodes()), fitness_fn=conflict_loss_cust, maximize=False, max_val=max_val)
-        # print(n,max_val)
-
-        # Define decay schedule
-        schedule = mlrose.ExpDecay()
-        # Solve problem using simulated annealing
-        best_state, best_fitness = mlrose.simulated_annealing(
-            problem, schedule=schedule, init_state=init_state, max_attempts=max_attempts, max_iters=max_iters)
+        best_state, best_fitness = _simulated_annealing(
+            incidence, init_state, loss_init, max_val, max_attempts=max_attempts, max_iters=max_iters)
 
         l2s[best_fitness].append((best_state, max_val))
 
         # Repeat without initial state
         max_val = n
-        problem = mlrose.DiscreteOpt(length=len(
-            G.nodes()), fitness_fn=conflict_loss_cust, maximize=False, max_val=max_val)
-
-        schedule = mlrose.ExpDecay()
-        best_state, best_fitness = mlrose.simulated_annealing(
-            problem, schedule=schedule, max_attempts=max_attempts, max_iters=max_iters)
+        rand_state = np.random.randint(0, max_val, size=len(nodes))
+        best_state, best_fitness = _simulated_annealing(
+            incidence, rand_state, conflict_loss(rand_state), max_val, max_attempts=max_attempts, max_iters=max_iters)
 
         l2s[best_fitness].append((best_state, max_val))
 
@@ -112,7 +105,7 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
 
     c2n = defaultdict(lambda: [])
     for i, c in enumerate(best_state):
-        c2n[c].append(i2n[i])
+        c2n[c].append(nodes[i])
 
     classes = [set(c2n[c]) for c in c2n]
 
@@ -120,7 +113,7 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
     if split_flag:
         classes = split_non_evidence_clusters(G, classes)
 
-    classes.sort(key=lambda x: -len(x))  # sort by size
+    classes.sort(key=len, reverse=True)  # sort by size
 
     end_time = time.time()
     stats['runtime'] = (end_time - start_time) / 60
@@ -128,6 +121,88 @@ def cluster_correlation_search(G, s=10, max_attempts=200, max_iters=5000, initia
     return classes, stats
 
 
+def _build_incidence(n, pos_i, pos_j, pos_w, neg_i, neg_j, neg_w):
+    """
+    Builds a CSR-like incidence structure over all edges.
+    :param n: number of nodes
+    :param pos_i, pos_j, pos_w: positive edge endpoints and weights
+    :param neg_i, neg_j, neg_w: negative edge endpoints and absolute weights
+    :return indptr, neighbor, weight, positive: per-node incident edge arrays
+    """
+    ends = np.concatenate([pos_i, pos_j, neg_i, neg_j])
+    others = np.concatenate([pos_j, pos_i, neg_j, neg_i])
+    weights = np.concatenate([pos_w, pos_w, neg_w, neg_w])
+    positive = np.concatenate([np.ones(2 * pos_i.size, dtype=bool),
+                               np.zeros(2 * neg_i.size, dtype=bool)])
+
+    order = np.argsort(ends, kind='stable')
+    indptr = np.searchsorted(ends[order], np.arange(n + 1))
+
+    return indptr, others[order], weights[order], positive[order]
+
+
+def _simulated_annealing(incidence, init_state, init_loss, max_val,
+                         max_attempts=200, max_iters=5000,
+                         init_temp=1.0, decay=0.005, min_temp=0.001):
+    """
+    Simulated annealing over node labelings of the conflict loss.
+    Each step proposes a new label for one node and evaluates the loss delta
+    over that node's incident edges only, with an exponential decay schedule.
+    :param incidence: incident-edge structure from _build_incidence
+    :param init_state: initial labeling
+    :param init_loss: conflict loss of the initial labeling
+    :param max_val: number of available labels
+    :param max_attempts: steps without improvement before stopping
+    :param max_iters: maximum number of steps
+    :return best_state, best_loss: best labeling found and its loss
+    """
+    indptr, neighbor, weight, positive = incidence
+
+    state = np.asarray(init_state).copy()
+    n = state.size
+
+    cur_loss = init_loss
+    best_state, best_loss = state.copy(), cur_loss
+
+    attempts = 0
+    for iters in range(max_iters):
+        if attempts >= max_attempts:
+            break
+
+        node = np.random.randint(n)
+        old_label = state[node]
+        # uniform draw over all labels != old_label
+        new_label = np.random.randint(max_val - 1)
+        if new_label >= old_label:
+            new_label += 1
+
+        lo, hi = indptr[node], indptr[node + 1]
+        nbr_labels = state[neighbor[lo:hi]]
+        w = weight[lo:hi]
+        pos = positive[lo:hi]
+
+        # positive edges cost their weight when labels differ,
+        # negative edges cost their absolute weight when labels agree
+        loss_old = w[pos & (nbr_labels != old_label)].sum() + w[~pos & (nbr_labels == old_label)].sum()
+        loss_new = w[pos & (nbr_labels != new_label)].sum() + w[~pos & (nbr_labels == new_label)].sum()
+        delta = loss_new - loss_old
+
+        if delta < 0:
+            attempts = 0
+        else:
+            attempts += 1
+
+        temp = max(init_temp * np.exp(-decay * iters), min_temp)
+        if delta < 0 or np.random.random() < np.exp(-delta / temp):
+            state[node] = new_label
+            cur_loss += delta
+
+            if cur_loss < best_loss:
+                best_state, best_loss = state.copy(), cur_loss
+
+    return best_state, best_loss
+
+
 def cluster_connected_components(G, is_non_value=lambda x: np.isnan(x)):
     """
     Apply connected_component clustering.
@@ -135,13 +210,23 @@ def cluster_connected_components(G, is_non_value=lambda x: np.isnan(x)):
     :return classes: list of clusters
     """
 
-    G = G.copy()
+    nodes = list(G.nodes())
+    if len(nodes) == 0:
+        return []
 
-    edges_negative = [(i, j) for (i, j) in G.edges() if G[i]
-                      [j]['weight'] < 0.0 or is_non_value(G[i][j]['weight'])]
-    G.remove_edges_from(edges_negative)
-    components = nx.connected_components(G)
-    classes = [set(component) for component in components]
+    # label components on a CSR adjacency instead of copying the graph
+    # and traversing NetworkX adjacency dicts in Python
+    csr = nx.to_scipy_sparse_array(G, nodelist=nodes, weight='weight', format='csr')
+    csr.data = np.where((csr.data < 0.0) | is_non_value(csr.data), 0.0, 1.0)
+    csr.eliminate_zeros()
+
+    _, labels = sp_connected_components(csr, directed=False)
+
+    order = np.argsort(labels, kind='stable')
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+
+    node_arr = np.array(nodes)
+    classes = [set(node_arr[idx].tolist()) for idx in np.split(order, boundaries)]
     classes.sort(key=lambda x: list(x)[0])
 
     return classes
@@ -60,7 +60,7 @@ class Annotator():
         Calculates the annotator-error based on the given parameters.
         """
         # Zero annotation
-        if np.random.choice([True, False], p=[self.zero_probability, 1 - self.zero_probability]):
+        if np.random.random() < self.zero_probability:
             return 0
 
         # nodes with high error
@@ -68,12 +68,12 @@ class Annotator():
             assert callable(self.he_distribution)
 
             error_sample = self.he_distribution(**self.he_param)
-            coefficient = np.random.choice([1, -1], p=[self.he_add_prob, 1 - self.he_add_prob])
+            coefficient = 1 if np.random.random() < self.he_add_prob else -1
 
-            return np.min([np.max([value + coefficient * error_sample, self.he_minimum]), self.he_max])
+            return min(max(value + coefficient * error_sample, self.he_minimum), self.he_max)
 
         assert callable(self.distribution)
         error_sample = self.distribution(**self.param)
-        coefficient = np.random.choice([1, -1], p=[self.add_probability, 1 - self.add_probability])
+        coefficient = 1 if np.random.random() < self.add_probability else -1
 
-        return np.min([np.max([value + coefficient * error_sample, self.minimum]), self.maximum])
+        return min(max(value + coefficient * error_sample, self.minimum), self.maximum)
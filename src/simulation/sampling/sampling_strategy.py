@@ -11,6 +11,23 @@ Each sampling function should return a list of sampled edges
 """
 
 
+def _node_array(graph: BaseGraph) -> np.ndarray:
+    """
+    Memoizes the node ids of a graph as a NumPy array on the graph object.
+    The cache is rebuilt when the node count changes, so the true graphs
+    used during simulation only pay the NodeView materialization once.
+
+    Args:
+        :param graph: graph to take the nodes from
+        :return np.ndarray: node ids
+    """
+    arr = getattr(graph, '_node_array_cache', None)
+    if arr is None or arr.size != graph.get_number_nodes():
+        arr = np.fromiter(graph.G.nodes(), dtype=np.int64)
+        graph._node_array_cache = arr
+    return arr
+
+
 def random_sampling(graph: BaseGraph, params: dict) -> list:
     """
     Random sampling.
@@ -29,17 +46,18 @@ def random_sampling(graph: BaseGraph, params: dict) -> list:
     sample_size = params.get('sample_size', None)
     assert sample_size is not None and type(sample_size) == int
 
-    sampled_edge_list = []
+    nodes = _node_array(graph)
+    n = nodes.size
 
-    for _ in range(sample_size):
-        u, v = sorted(random.sample(graph.G.nodes(), 2))
+    # draw all node pairs at once; the second index comes from [0, n-1)
+    # and is shifted past the first, so self-loops cannot occur
+    i = np.random.randint(0, n, size=sample_size)
+    j = np.random.randint(0, n - 1, size=sample_size)
+    j += j >= i
 
-        if u == v:
-            v = random.sample(list(graph.G.nodes() - {u}), 1)[0]
+    pairs = np.sort(nodes[np.stack((i, j), axis=1)], axis=1)
 
-        sampled_edge_list.append((u, v, graph.get_edge(u, v)))
-
-    return sampled_edge_list
+    return [(int(u), int(v), graph.get_edge(int(u), int(v))) for u, v in pairs]
 
 
 def page_rank(graph: BaseGraph, params: dict) -> list:
@@ -71,21 +89,30 @@ def page_rank(graph: BaseGraph, params: dict) -> list:
 
     assert type(last_node) == int or last_node is None
 
+    nodes = _node_array(graph)
+    n = nodes.size
+
     if last_node is None:
-        last_node = random.sample(graph.G.nodes(), 1)[0]
+        last_node = int(nodes[np.random.randint(n)])
     # ===END Guard===
 
+    # pre-draw teleport decisions, teleport targets and next-node indices for the whole walk
+    teleport = np.random.random(sample_size) < tp_coef
+    teleport_nodes = nodes[np.random.randint(0, n, size=sample_size)]
+    next_idx = np.random.randint(0, n - 1, size=sample_size)
+
     sampled_edge_list = []
 
-    for _ in range(sample_size):
+    for i in range(sample_size):
         # choose next start and following node
-        last_node = np.random.choice([last_node, random.sample(graph.G.nodes(), 1)[0]], p=[1 - tp_coef, tp_coef])
-        next_node = random.sample(list(graph.G.nodes() - {last_node}), 1)[0]
-
-        if last_node == next_node:
-            print('WTF?')
-            print(last_node in list(graph.G.nodes() - {last_node}))
-            exit()
+        if teleport[i]:
+            last_node = int(teleport_nodes[i])
+
+        next_node = int(nodes[next_idx[i]])
+        if next_node == last_node:
+            # drawing from [0, n-1) and mapping collisions to the last
+            # node keeps the choice uniform over all nodes != last_node
+            next_node = int(nodes[n - 1])
 
         sampled_edge_list.append((last_node, next_node, graph.get_edge(last_node, next_node)))
         last_node = next_node
@@ -1,8 +1,7 @@
-import random
 import numpy as np
 
 from graphs.base_graph import BaseGraph
-from simulation.sampling.sampling_strategy import random_sampling
+from simulation.sampling.sampling_strategy import random_sampling, _node_array
 
 
 def dwug_sampling(sample_graph: BaseGraph, annotated_graph: BaseGraph, percentage_nodes: float or int, percentage_edges: float or int, min_size_mc: int, num_flag: bool = False, random_sample_empty_round: int = 0) -> list:
@@ -32,10 +31,9 @@ def dwug_sampling(sample_graph: BaseGraph, annotated_graph: BaseGraph, percentag
 def _z_sampling_round(sample_graph: BaseGraph, percentage_nodes: float, percentage_edges: float, num_flag: bool) -> list:
     number_nodes = percentage_nodes if num_flag else round(sample_graph.get_number_nodes() * percentage_nodes)
 
-    try:
-        nodes = np.random.choice(sample_graph.G.nodes(), number_nodes, replace=False)
-    except ValueError:
-        nodes = sample_graph.G.nodes()
+    # cached node array instead of converting the NodeView every round
+    node_arr = _node_array(sample_graph)
+    nodes = np.random.choice(node_arr, min(number_nodes, node_arr.size), replace=False)
 
     max_edges = percentage_edges if num_flag else len(nodes) * (len(nodes) - 1) * 0.5 * percentage_edges
 
@@ -43,66 +41,99 @@ def _z_sampling_round(sample_graph: BaseGraph, percentage_nodes: float, percenta
 
 
 def _n_sampling_round(sample_graph: BaseGraph, annotated_graph: BaseGraph, min_size_mc: int, percentage_nodes: float, percentage_edges: float, num_flag: bool) -> list:
-    # Nodes not in cluster size >= min_size_mc
-    nodes = [node for k, v in annotated_graph.get_community_nodes().items() if len(v) < min_size_mc for node in v]
-    multi_clusters = [v for k, v in annotated_graph.get_community_nodes().items() if len(v) >= min_size_mc]
+    # split the partition once: nodes not in a cluster of size >= min_size_mc
+    # vs. the multi-clusters themselves
+    nodes = []
+    multi_clusters = []
+    multi_cluster_sets = []
+    for v in annotated_graph.get_community_nodes().values():
+        if len(v) >= min_size_mc:
+            multi_clusters.append(v)
+            multi_cluster_sets.append(frozenset(v))
+        else:
+            nodes.extend(v)
+
+    # judged-pair adjacency, so node-cluster connectivity is a set intersection
+    adj = _judged_adjacency(annotated_graph)
 
     # Find nodes to be used in the sample round
     combination_nodes = []
     exploration_nodes = []
 
+    empty = frozenset()
     for node in nodes:
+        neighbors = adj.get(node, empty)
         cn_flag = False
-        for cluster in multi_clusters:
-            cn_flag |= not _check_node_cluster_con(annotated_graph, node, cluster)
+        for cluster_set in multi_cluster_sets:
+            cn_flag |= neighbors.isdisjoint(cluster_set)
 
         if cn_flag:
             combination_nodes.append(node)
         else:
             exploration_nodes.append(node)
 
-    # add new nodes to combination phase
-    not_added_nodes = list(set(sample_graph.G.nodes()) - set(annotated_graph.G.nodes()))
+    # add new nodes to combination phase; the not-added set is seeded once
+    # and maintained incrementally by the annotated graph
+    not_added = getattr(annotated_graph, '_not_added_nodes', None)
+    if not_added is None:
+        not_added = set(sample_graph.G.nodes()) - set(annotated_graph.G.nodes())
+        annotated_graph._not_added_nodes = not_added
+
+    not_added_nodes = np.fromiter(not_added, dtype=np.int64, count=len(not_added))
     num_new_nodes_add = percentage_nodes if num_flag else round(sample_graph.get_number_nodes() * percentage_nodes)
 
-    try:
-        new_nodes = np.random.choice(not_added_nodes, num_new_nodes_add, replace=False)
-    except ValueError:
-        new_nodes = not_added_nodes
+    new_nodes = np.random.choice(not_added_nodes, min(num_new_nodes_add, not_added_nodes.size), replace=False)
 
     combination_nodes.extend(new_nodes)
     max_edges = percentage_edges if num_flag else len(exploration_nodes) * (len(exploration_nodes) - 1) * 0.5 * percentage_edges
 
     # execute both phases
     sampled_edge_list = []
-    sampled_edge_list.extend(_combination_phase(sample_graph, annotated_graph, combination_nodes, multi_clusters))
+    sampled_edge_list.extend(_combination_phase(sample_graph, adj, combination_nodes, multi_clusters, multi_cluster_sets))
     sampled_edge_list.extend(_exploration_phase(sample_graph, exploration_nodes, max_edges))
 
     return sampled_edge_list
 
 
-def _combination_phase(sample_graph: BaseGraph, annotated_graph: BaseGraph, nodes: list, multi_clusters: list) -> list:
+def _combination_phase(sample_graph: BaseGraph, adj: dict, nodes: list, multi_clusters: list, multi_cluster_sets: list) -> list:
     if len(nodes) == 0:
         return []
 
     sampled_edge_list = []
 
-    for node in nodes:
-        for cluster in multi_clusters:
-            if not _check_node_cluster_con(annotated_graph, node, cluster):
-                connection = random.choice(cluster)
-                sampled_edge_list.append((node, connection, sample_graph.get_edge(node, connection)))
+    empty = frozenset()
+    # batch per cluster: all unconnected nodes draw their connection at once
+    for cluster, cluster_set in zip(multi_clusters, multi_cluster_sets):
+        missing = [node for node in nodes if adj.get(node, empty).isdisjoint(cluster_set)]
+        if len(missing) == 0:
+            continue
+
+        cluster_arr = np.asarray(cluster)
+        connections = cluster_arr[np.random.randint(0, cluster_arr.size, size=len(missing))].tolist()
+        sampled_edge_list.extend((node, connection, sample_graph.get_edge(node, connection))
+                                 for node, connection in zip(missing, connections))
 
     return sampled_edge_list
 
 
-def _check_node_cluster_con(graph: BaseGraph, node: int, cluster: list) -> bool:
-    for c_node in cluster:
-        u, v = sorted([node, c_node])
-        if graph.get_edge(u, v) is not None:
-            return True
+def _judged_adjacency(annotated_graph: BaseGraph) -> dict:
+    """
+    Builds a node -> set of neighbors dict over all judged pairs of the graph
+    (falling back to the present edges, if no judgements are tracked).
 
-    return False
+    Args:
+        :param annotated_graph: annotation graph
+        :return dict: adjacency over judged pairs
+    """
+    judged = annotated_graph.G.graph.get('edge_added_weights', None)
+    pairs = judged.keys() if judged is not None else annotated_graph.G.edges()
+
+    adj = {}
+    for u, v in pairs:
+        adj.setdefault(u, set()).add(v)
+        adj.setdefault(v, set()).add(u)
+
+    return adj
 
 
 def _exploration_phase(sample_graph: BaseGraph, nodes: list, max_edges: float) -> list:
@@ -110,12 +141,20 @@ def _exploration_phase(sample_graph: BaseGraph, nodes: list, max_edges: float) -
     if len(nodes) == 0 or len(nodes) == 1:
         return []
 
-    sampled_edge_list = []
-    last_node = random.choice(nodes)
+    nodes_arr = np.asarray(nodes)
+    n = nodes_arr.size
 
-    while len(sampled_edge_list) < max_edges:
-        next_node = random.choice(np.delete(np.array(nodes), np.where(np.array(nodes) == last_node)))
-        sampled_edge_list.append((last_node, next_node, sample_graph.get_edge(last_node, next_node)))
-        last_node = next_node
+    last_idx = np.random.randint(n)
 
-    return sampled_edge_list
+    # batch all steps up front; drawing from [0, n-1) and shifting indices
+    # >= last_idx picks uniformly over all nodes != the current one
+    idxs = np.random.randint(0, n - 1, size=int(np.ceil(max(max_edges, 0)))).tolist()
+
+    # resolve the walk as plain ints first, then hit the node array once
+    walk = [last_idx]
+    for idx in idxs:
+        last_idx = idx + (idx >= last_idx)
+        walk.append(last_idx)
+    walk_nodes = nodes_arr[walk].tolist()
+
+    return [(u, v, sample_graph.get_edge(u, v)) for u, v in zip(walk_nodes, walk_nodes[1:])]
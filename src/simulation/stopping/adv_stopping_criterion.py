@@ -1,22 +1,46 @@
 from graphs.base_graph import BaseGraph
 from simulation.stopping.utils.stopping_utils import apd as _apd
 from simulation.stopping.utils.stopping_utils import entropy_approximation as _ea
-from simulation.stopping.utils.stopping_utils import rmse_mean as _rmse
-from simulation.stopping.utils.stopping_utils import mse_mean as _mse
+from simulation.stopping.utils.stopping_utils import ConvergenceMonitor
 from simulation.stopping.utils.stopping_utils import clean_labels as _cl
 from simulation.stopping.utils.stopping_utils import length_padding as _lp
 
+import numpy as np
+
 from sklearn.metrics import adjusted_rand_score
 from scipy.spatial.distance import jensenshannon as _js_divergance
 
 """
 This module provides a more advance use of stopping criterions, like using time step information.
-If any information is being used, a reset function has to be provided
+If any information is being used, a reset function has to be provided.
+All state lives inside the params dict of the criterion, so independent
+simulations (also across processes) cannot interfere with each other.
 """
 
 # ===Convergence Criteria===
 
-_apd_time_steps = []
+
+def _get_monitor(params: dict, timesteps: int) -> ConvergenceMonitor:
+    # windows are fixed-length, so a changed timeframe starts a new window
+    monitor = params.get('_monitor', None)
+    if monitor is None or monitor.timesteps != timesteps:
+        monitor = params['_monitor'] = ConvergenceMonitor(timesteps)
+    return monitor
+
+
+def convergence_reset(params: dict = None) -> None:
+    """
+    Clears the state a convergence criterion keeps inside its params dict.
+
+    Args:
+        :param params: params dict handed to the criterion
+    """
+    if params is None:
+        return
+
+    params.pop('_monitor', None)
+    params.pop('_last_label', None)
+    params.pop('_last_cluster', None)
 
 
 def apd_convergence(graph: BaseGraph, params: dict) -> bool:
@@ -35,33 +59,27 @@ def apd_convergence(graph: BaseGraph, params: dict) -> bool:
     """
     # ===Guard Phase===
     sample_size = params.get('sample_size', 50)
-    assert type(sample_size) == int
-
     timesteps = params.get('timesteps', 5)
-    assert type(timesteps) == int
-
     threshold = params.get('threshold', .1)
-    assert type(threshold) == float
 
-    global _apd_time_steps
+    # params dicts are reused every iteration, so the guards only run once
+    if not params.get('_validated', False):
+        assert type(sample_size) == int
+        assert type(timesteps) == int
+        assert type(threshold) == float
+        params['_validated'] = True
     # ===End Guard Phase===
 
-    _apd_time_steps.append((len(_apd_time_steps), _apd(graph, sample_size)))
+    monitor = _get_monitor(params, timesteps)
+    monitor.push(_apd(graph, sample_size))
 
-    if len(_apd_time_steps) < timesteps:
+    if not monitor.full():
         return False
 
-    _rmse_value = _rmse(_apd_time_steps[-timesteps:])
-
-    return _rmse_value < threshold
-
+    return monitor.rmse() < threshold
 
-def apd_convergence_reset():
-    global _apd_time_steps
-    _apd_time_steps.clear()
 
-
-_entropy_time_steps = []
+apd_convergence_reset = convergence_reset
 
 
 def entropy_approx_convergence(graph: BaseGraph, params: dict) -> bool:
@@ -78,33 +96,26 @@ def entropy_approx_convergence(graph: BaseGraph, params: dict) -> bool:
     """
     # ===Guard Phase===
     threshold_entropy = params.get('threshold_entropy', 2.5)
-    assert type(threshold_entropy) == float
-
     timesteps = params.get('timesteps', 5)
-    assert type(timesteps) == int
-
     threshold_conv = params.get('threshold_conv', .1)
-    assert type(threshold_conv) == float
 
-    global _entropy_time_steps
+    if not params.get('_validated', False):
+        assert type(threshold_entropy) == float
+        assert type(timesteps) == int
+        assert type(threshold_conv) == float
+        params['_validated'] = True
     # ===End Guard Phase===
 
-    _entropy_time_steps.append((len(_entropy_time_steps), _ea(graph, threshold_entropy)))
+    monitor = _get_monitor(params, timesteps)
+    monitor.push(_ea(graph, threshold_entropy))
 
-    if len(_entropy_time_steps) < timesteps:
+    if not monitor.full():
         return False
 
-    _rmse_value = _rmse(_entropy_time_steps[-timesteps:])
-
-    return _rmse_value < threshold_conv
-
+    return monitor.rmse() < threshold_conv
 
-def entropy_approx_convergence_reset():
-    global _entropy_time_steps
-    _entropy_time_steps.clear()
 
-
-_num_clusters = []
+entropy_approx_convergence_reset = convergence_reset
 
 
 def cluster_size_change_conv(graph: BaseGraph, params: dict) -> bool:
@@ -121,37 +132,28 @@ def cluster_size_change_conv(graph: BaseGraph, params: dict) -> bool:
     """
     # ===End Guard Phase===
     timesteps = params.get('timesteps', 5)
-    assert type(timesteps) == int
-
     threshold = params.get('threshold', .1)
-    assert type(threshold) == float
-
     error_func = params.get('error_func', 'mse')
-    assert type(threshold) == str
-    if error_func == 'rmse':
-        error_func = _rmse
-    else:
-        error_func = _mse
 
-    global _num_clusters
+    if not params.get('_validated', False):
+        assert type(timesteps) == int
+        assert type(threshold) == float
+        assert type(error_func) == str
+        params['_validated'] = True
     # ===End Guard Phase===
-    _num_clusters.append(graph.get_number_communities())
 
-    if len(_num_clusters) < timesteps:
+    monitor = _get_monitor(params, timesteps)
+    monitor.push(graph.get_number_communities())
+
+    if not monitor.full():
         return False
 
-    _efv = error_func(_num_clusters[-timesteps:])
+    _efv = monitor.rmse() if error_func == 'rmse' else monitor.mse()
 
     return _efv < threshold
 
 
-def cluster_size_change_conv_reset():
-    global _num_clusters
-    _num_clusters.clear()
-
-
-_rand_index = []
-_last_label = None
+cluster_size_change_conv_reset = convergence_reset
 
 
 def _rand_index_conv(graph: BaseGraph, params: dict) -> bool:
@@ -168,46 +170,41 @@ def _rand_index_conv(graph: BaseGraph, params: dict) -> bool:
     """
     # ===End Guard Phase===
     timesteps = params.get('timesteps', 5)
-    assert type(timesteps) == int
-
     threshold = params.get('threshold', .1)
-    assert type(threshold) == float
-
     error_func = params.get('error_func', 'mse')
-    assert type(threshold) == str
-    if error_func == 'rmse':
-        error_func = _rmse
-    else:
-        error_func = _mse
 
-    global _rand_index
-    global _last_label
+    if not params.get('_validated', False):
+        assert type(timesteps) == int
+        assert type(threshold) == float
+        assert type(error_func) == str
+        params['_validated'] = True
     # ===End Guard Phase===
-    if _last_label is None:
-        _last_label = graph.labels.copy()
-        return False
 
-    _rand_index.append(adjusted_rand_score(*_cl(_last_label, graph.labels)))
-    _last_label = graph.labels.copy()
+    current = np.asarray(graph.labels)
+    last_label = params.get('_last_label', None)
 
-    if len(_rand_index) < timesteps:
+    if last_label is None or last_label.shape != current.shape:
+        params['_last_label'] = current.copy()
         return False
 
-    _efv = error_func(_rand_index[-timesteps:])
+    monitor = _get_monitor(params, timesteps)
 
-    return _efv < threshold
+    if np.array_equal(last_label, current):
+        # unchanged labels agree perfectly with themselves
+        monitor.push(1.0)
+    else:
+        monitor.push(adjusted_rand_score(*_cl(last_label, current)))
+        np.copyto(last_label, current)
 
+    if not monitor.full():
+        return False
 
-def _rand_index_conv_reset():
-    global _rand_index
-    global _last_label
+    _efv = monitor.rmse() if error_func == 'rmse' else monitor.mse()
 
-    _rand_index.clear()
-    _last_label = None
+    return _efv < threshold
 
 
-_jsd = []
-_last_cluster = None
+_rand_index_conv_reset = convergence_reset
 
 
 def _jsd_conv(graph: BaseGraph, params: dict) -> bool:
@@ -224,40 +221,34 @@ def _jsd_conv(graph: BaseGraph, params: dict) -> bool:
     """
     # ===End Guard Phase===
     timesteps = params.get('timesteps', 5)
-    assert type(timesteps) == int
-
     threshold = params.get('threshold', .1)
-    assert type(threshold) == float
-
     error_func = params.get('error_func', 'mse')
-    assert type(threshold) == str
-    if error_func == 'rmse':
-        error_func = _rmse
-    else:
-        error_func = _mse
 
-    global _jsd
-    global _last_cluster
+    if not params.get('_validated', False):
+        assert type(timesteps) == int
+        assert type(threshold) == float
+        assert type(error_func) == str
+        params['_validated'] = True
     # ===End Guard Phase===
-    if _last_cluster is None:
-        _last_cluster = graph.get_community_sizes().copy()
+
+    current = np.asarray(graph.get_community_sizes(), dtype=np.float64)
+    last_cluster = params.get('_last_cluster', None)
+
+    if last_cluster is None:
+        params['_last_cluster'] = current
         return False
 
-    cl1, cl2 = _lp(_last_cluster, graph.get_community_sizes())
-    _jsd.append(_js_divergance(cl1, cl2, base=2))
-    _last_cluster = graph.get_community_sizes().copy()
+    cl1, cl2 = _lp(last_cluster, current)
+    monitor = _get_monitor(params, timesteps)
+    monitor.push(_js_divergance(cl1, cl2, base=2))
+    params['_last_cluster'] = current
 
-    if len(_jsd) < timesteps:
+    if not monitor.full():
         return False
 
-    _efv = error_func(_jsd[-timesteps:])
+    _efv = monitor.rmse() if error_func == 'rmse' else monitor.mse()
 
     return _efv < threshold
 
 
-def _jsd_conv_reset():
-    global _jsd
-    global _last_cluster
-
-    _jsd.clear()
-    _last_cluster = None
+_jsd_conv_reset = convergence_reset
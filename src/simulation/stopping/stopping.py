@@ -67,4 +67,5 @@ class Stopping(RunnableStep):
         self.sc_hit_flag: bool = False
         self.sc_annotated_graph: BaseGraph = None
         if callable(self.clean_up_func):
-            self.clean_up_func()
+            # criteria keep their state inside the params dict
+            self.clean_up_func(self.params)
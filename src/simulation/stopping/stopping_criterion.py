@@ -5,6 +5,7 @@ from sklearn.metrics import adjusted_rand_score as ari
 
 from graphs.base_graph import BaseGraph
 from simulation.stopping.utils.stopping_utils import check_connectivity_two_clusters
+from simulation.stopping.utils.stopping_utils import random_sample as _rs
 from simulation.stopping.utils.stopping_utils import random_sample_cluster as _rsc
 from simulation.stopping.utils.stopping_utils import pertubate as _pertubate
 from simulation.stopping.utils.stopping_utils import gen_labels as _gen_labels
@@ -36,10 +37,13 @@ def cluster_connected(graph: BaseGraph, params: dict) -> bool:
     """
     # ===Guard Phase===
     cluster_min_size = params.get('cluster_min_size', 5)
-    assert type(cluster_min_size) == int
-
     min_num_edges = params.get('min_num_edges', 1)
-    assert type(min_num_edges) == int or min_num_edges == 'fully'
+
+    # params dicts are reused every iteration, so the guards only run once
+    if not params.get('_validated', False):
+        assert type(cluster_min_size) == int
+        assert type(min_num_edges) == int or min_num_edges == 'fully'
+        params['_validated'] = True
 
     min_size_one_cluster = params.get(
         'min_size_one_cluster', graph.get_number_nodes())
@@ -57,16 +61,18 @@ def cluster_connected(graph: BaseGraph, params: dict) -> bool:
     if len(communities) == 1:
         return len(communities[0]) >= min_size_one_cluster
 
-    flag = True
+    # hash the edges once, so each membership test is O(1)
+    edge_set = frozenset(graph.G.edges())
 
     for i in range(len(communities)):
         for j in range(i + 1, len(communities)):
             min_connections = min_num_edges if min_num_edges != 'fully' else len(
                 communities[i]) * len(communities[j])
-            flag = flag and check_connectivity_two_clusters(
-                graph.G.edges(), communities[i], communities[j], min_connections)
+            if not check_connectivity_two_clusters(
+                    edge_set, communities[i], communities[j], min_connections):
+                return False
 
-    return flag
+    return True
 
 
 def number_edges_found(graph: BaseGraph, params: dict) -> bool:
@@ -80,7 +86,10 @@ def number_edges_found(graph: BaseGraph, params: dict) -> bool:
         :return flag: if sG contains the number of edges
     """
     number_edges = params.get('number_edges', None)
-    assert type(number_edges) == int
+
+    if not params.get('_validated', False):
+        assert type(number_edges) == int
+        params['_validated'] = True
 
     return graph.get_number_edges() >= number_edges
 
@@ -96,10 +105,12 @@ def percentage_edges_found(graph: BaseGraph, params: dict) -> bool:
         :return flag: if sG contains the percentage of edges
     """
     percentage = params.get('percentage', None)
-    assert type(percentage) == float
-
     number_edges = params.get('number_edges', None)
-    assert type(number_edges) == int
+
+    if not params.get('_validated', False):
+        assert type(percentage) == float
+        assert type(number_edges) == int
+        params['_validated'] = True
 
     return graph.get_number_edges() >= (percentage * number_edges)
 
@@ -114,7 +125,10 @@ def edges_added(graph: BaseGraph, params: dict) -> bool:
         :return flag: if sG contains the percentage of edges
     """
     number_edges = params.get('number_edges', None)
-    assert type(number_edges) == int
+
+    if not params.get('_validated', False):
+        assert type(number_edges) == int
+        params['_validated'] = True
 
     return graph.get_num_added_edges() >= number_edges
 
@@ -134,28 +148,29 @@ def bootstraping(graph: BaseGraph, params: dict) -> bool:
         :param stat_params: statistical params
     """
     rounds = params.get('rounds', None)
-    assert type(rounds) == int
-
     sample_size = params.get('sample_size', None)
-    assert type(sample_size) == int
-
     alpha = params.get('alpha', None)
-    assert type(alpha) == float
-
     bound = params.get('bound', None)
-    assert type(bound) == tuple and len(bound) == 2
-
     stat_func = params.get('stat_func', None)
-    assert callable(stat_func)
-
     stat_params = params.get('stat_params', None)
-    assert type(stat_params) == dict
+
+    if not params.get('_validated', False):
+        assert type(rounds) == int
+        assert type(sample_size) == int
+        assert type(alpha) == float
+        assert type(bound) == tuple and len(bound) == 2
+        assert callable(stat_func)
+        assert type(stat_params) == dict
+        params['_validated'] = True
+
+    # one reusable graph instead of allocating a fresh one per round
+    g = BaseGraph()
 
     stats = []
-    for _ in rounds:
-        g = BaseGraph()
+    for _ in range(rounds):
+        g.reset()
         g.add_edges(_rs(graph, sample_size))
-        stats.append(stat_func(g, params))
+        stats.append(stat_func(g, stat_params))
 
     stats.sort()
     percentile = np.percentile(stats, [((1.0 - alpha) / 2.0) * 100, (alpha + ((1.0 - alpha) / 2.0)) * 100])
@@ -177,26 +192,27 @@ def bootstraping_jsd(graph: BaseGraph, params: dict) -> bool:
         :param bound: target upper bound
     """
     min_sample_size = params.get('min_sample_size', 100)
-    assert type(min_sample_size) == int
-
     rounds = params.get('rounds', 30)
-    assert type(rounds) == int
-
     sample_size = params.get('sample_size', 150)
-    assert type(sample_size) == int
-
     alpha = params.get('alpha', 0.95)
-    assert type(alpha) == float
-
     bound = params.get('bound', 0.05)
-    assert type(bound) == float and 0.0 <= bound <= 1.0
+
+    if not params.get('_validated', False):
+        assert type(min_sample_size) == int
+        assert type(rounds) == int
+        assert type(sample_size) == int
+        assert type(alpha) == float
+        assert type(bound) == float and 0.0 <= bound <= 1.0
+        params['_validated'] = True
 
     if graph.get_number_nodes() < min_sample_size:
         return False
 
+    community_sizes = graph.get_community_sizes()
+
     stats = []
     for _ in range(rounds):
-        stats.append(jensenshannon(graph.get_community_sizes(), _rsc(graph, sample_size), base=2)**2)
+        stats.append(jensenshannon(community_sizes, _rsc(graph, sample_size), base=2)**2)
 
     stats.sort()
     percentile = np.percentile(stats, [((1.0 - alpha) / 2.0) * 100, (alpha + ((1.0 - alpha) / 2.0)) * 100])
@@ -221,25 +237,22 @@ def bootstraping_perturbation_ari(graph: BaseGraph, params: dict) -> bool:
         :return: if mean ARI score over bound
     """
     min_sample_size = params.get('min_sample_size', 100)
-    assert type(min_sample_size) == int
-
     rounds = params.get('rounds', 30)
-    assert type(rounds) == int
-
     _range = params.get('range', (1, 4))
-    assert type(_range) == tuple
-
     share = params.get('share', 0.1)
-    assert type(share) == float
-
     lower_bound = params.get('lower_bound', 0.95)
-    assert type(lower_bound) == float and lower_bound <= 1.0
-
     clustering_func = params.get('clustering_func', None)
-    assert callable(clustering_func)
-
     clustering_params = params.get('clustering_params', {})
-    assert type(clustering_params) == dict
+
+    if not params.get('_validated', False):
+        assert type(min_sample_size) == int
+        assert type(rounds) == int
+        assert type(_range) == tuple
+        assert type(share) == float
+        assert type(lower_bound) == float and lower_bound <= 1.0
+        assert callable(clustering_func)
+        assert type(clustering_params) == dict
+        params['_validated'] = True
 
     if graph.get_number_nodes() < min_sample_size:
         return False
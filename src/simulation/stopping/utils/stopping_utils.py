@@ -1,8 +1,8 @@
 import numpy as np
 import random
-from collections import Counter
+from collections import deque
 from graphs.base_graph import BaseGraph
-from sklearn.metrics import mean_squared_error
+from simulation.sampling.sampling_strategy import _node_array
 from scipy.spatial.distance import jensenshannon
 
 
@@ -13,15 +13,14 @@ def length_padding(list1: list, list2: list) -> (list, list):
         :param list1: first list
         :param list2: second list
     """
-    n_l1, n_l2 = list1.copy(), list2.copy()
-    if len(n_l1) == len(n_l2):
-        return n_l1, n_l2
+    n_l1 = np.asarray(list1, dtype=np.float64)
+    n_l2 = np.asarray(list2, dtype=np.float64)
 
-    if len(n_l1) < len(n_l2):
-        n_l1.extend([0] * (len(n_l2) - len(n_l1)))
-        return n_l1, n_l2
+    if n_l1.size < n_l2.size:
+        n_l1 = np.pad(n_l1, (0, n_l2.size - n_l1.size))
+    elif n_l2.size < n_l1.size:
+        n_l2 = np.pad(n_l2, (0, n_l1.size - n_l2.size))
 
-    n_l2.extend([0] * (len(n_l1) - len(n_l2)))
     return n_l1, n_l2
 
 
@@ -37,40 +36,43 @@ def clean_labels(ref_labels: list, current_labels: list) -> (list, list):
     """
     assert len(ref_labels) == len(current_labels)
 
-    new_ref = []
-    new_crr = []
+    ref = np.asarray(ref_labels)
+    crr = np.asarray(current_labels)
+    mask = (ref != -1) & (crr != -1)
 
-    for i in range(len(ref_labels)):
-        if current_labels[i] != -1 and ref_labels[i] != -1:
-            new_ref.append(ref_labels[i])
-            new_crr.append(current_labels[i])
-
-    return new_ref, new_crr
+    return ref[mask], crr[mask]
 
 
 def random_sample(graph: BaseGraph, sample_size: int) -> list:
-    sampled_edge_list = []
-    for _ in range(sample_size):
-        u, v = sorted(random.sample(graph.G.nodes(), 2))
-        sampled_edge_list.append((u, v, graph.get_edge(u, v)))
+    nodes = _node_array(graph)
+
+    # all pairs in two draws; shifting the second index avoids self-pairs
+    i = np.random.randint(0, nodes.size, size=sample_size)
+    j = np.random.randint(0, nodes.size - 1, size=sample_size)
+    j += j >= i
+
+    pairs = np.sort(np.stack((nodes[i], nodes[j]), axis=1), axis=1)
 
-    return sampled_edge_list
+    return [(u, v, graph.get_edge(u, v)) for u, v in pairs.tolist()]
 
 
-def check_connectivity_two_clusters(edge_list: list, f_community: list, s_community: list, min_connections: int) -> bool:
+def check_connectivity_two_clusters(edge_set: frozenset, f_community: list, s_community: list, min_connections: int) -> bool:
     """
     Check if minimum connections between both communities.
 
     Args:
-        :param edge_list: edge list on which to check
+        :param edge_set: set of edges on which to check
         :param f_community: first node list
         :param f_community: second node list
         :param min_connections: minimum connection so that it evaluates to True
     """
+    if len(f_community) > len(s_community):
+        f_community, s_community = s_community, f_community
+
     count = 0
     for u in f_community:
         for v in s_community:
-            if (u, v) in edge_list:
+            if (u, v) in edge_set or (v, u) in edge_set:
                 count += 1
                 if count >= min_connections:
                     return True
@@ -87,13 +89,17 @@ def apd(graph: BaseGraph, sample_size: int) -> float:
         :param sample_size: the sample size to take from the graph
         :return float: apd of the sample
     """
-    sampled_edge_list = []
+    nodes = _node_array(graph)
+
+    # draw all pairs at once; the second index is drawn from [0, n-1) and
+    # shifted past the first one, so u != v stays uniform
+    i = np.random.randint(0, nodes.size, size=sample_size)
+    j = np.random.randint(0, nodes.size - 1, size=sample_size)
+    j += j >= i
 
-    for _ in range(sample_size):
-        u, v = sorted(random.sample(graph.G.nodes(), 2))
-        sampled_edge_list.append(graph.get_edge(u, v))
+    pairs = np.sort(np.stack((nodes[i], nodes[j]), axis=1), axis=1)
 
-    return sum(sampled_edge_list) / sample_size
+    return sum(graph.get_edge(u, v) for u, v in pairs.tolist()) / sample_size
 
 
 def entropy_approximation(graph: BaseGraph, threshold: float) -> float:
@@ -105,23 +111,74 @@ def entropy_approximation(graph: BaseGraph, threshold: float) -> float:
         :returns float: value of the metric
     """
     num_nodes = graph.get_number_nodes()
-    node_num_edges_over_threshold = Counter([node for k, v in graph.get_weight_edge().items() if k >= threshold for t in v for node in t])
+    edge_weight = graph.get_edge_weight()
 
-    s_sum = 0
-    for i in graph.G.nodes():
-        s_sum += np.log2((1 + node_num_edges_over_threshold.get(i, 0)) / num_nodes)
+    if len(edge_weight) == 0:
+        return np.log2(num_nodes)
+
+    weights = np.fromiter(edge_weight.values(), dtype=np.float64, count=len(edge_weight))
+    ends = np.array(list(edge_weight.keys()), dtype=np.int64)[weights >= threshold]
+
+    # sum_i log2((1 + c_i) / N) splits into the per-node count term and a
+    # constant -N * log2(N); nodes without qualifying edges only add the latter
+    _, counts = np.unique(ends, return_counts=True)
+    s_sum = np.log2(1.0 + counts).sum() - num_nodes * np.log2(num_nodes)
 
     return -(s_sum / num_nodes)
 
 
+class ConvergenceMonitor:
+    """
+    Fixed-length window over a time series with incrementally maintained
+    running sums, so the (R)MSE against the window mean is O(1) per step
+    and old values do not accumulate.
+
+    Args:
+        :param timesteps: window length to track
+    """
+
+    def __init__(self, timesteps: int):
+        self.timesteps = timesteps
+        self._window = deque(maxlen=timesteps)
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def push(self, value: float) -> None:
+        value = float(value)
+        if len(self._window) == self.timesteps:
+            evicted = self._window[0]
+            self._sum -= evicted
+            self._sumsq -= evicted * evicted
+
+        self._window.append(value)
+        self._sum += value
+        self._sumsq += value * value
+
+    def full(self) -> bool:
+        return len(self._window) == self.timesteps
+
+    def mse(self) -> float:
+        mean = self._sum / len(self._window)
+        # clamp, as the running sums can drift slightly below zero
+        return max(self._sumsq / len(self._window) - mean * mean, 0.0)
+
+    def rmse(self) -> float:
+        return self.mse() ** 0.5
+
+    def reset(self) -> None:
+        self._window.clear()
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+
 def mse_mean(time_series: list) -> float:
-    _mean = [np.mean(time_series)] * len(time_series)
-    return mean_squared_error(time_series, _mean)
+    x = np.asarray(time_series, dtype=np.float64)
+    d = x - x.mean()
+    return float(d @ d / x.size)
 
 
 def rmse_mean(time_series: list) -> float:
-    _mean = [np.mean(time_series)] * len(time_series)
-    return mean_squared_error(time_series, _mean, squared=False)
+    return mse_mean(time_series) ** 0.5
 
 
 def random_sample_cluster(graph: BaseGraph, sample_size: int) -> list: